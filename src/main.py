@@ -1,24 +1,231 @@
 import sys
 import json
+import configparser
+import io
+import locale
 import os
 import logging
-import subprocess
-import threading
+import logging.handlers
+import time
 import re
+import shutil
+import queue
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from urllib.parse import urlparse, parse_qs
+from types import MappingProxyType
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-import pyperclip
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QLineEdit, QPushButton, QTextEdit, QComboBox, QCheckBox,
+    QLineEdit, QPushButton, QComboBox, QCheckBox,
     QLabel, QFileDialog, QMessageBox, QDialog, QSpinBox,
-    QFrame, QScrollArea, QProgressBar
+    QFrame
 )
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QObject, QThread
-from PyQt6.QtGui import QFont, QIcon, QPixmap, QColor
-from PyQt6.QtCore import QSize
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QThread, QProcess
+from PyQt6.QtGui import QFont, QKeySequence
+
+
+# Config and history live next to the executable when packaged, next to main.py otherwise
+if getattr(sys, 'frozen', False):
+    _APP_DIR = Path(sys.executable).resolve().parent
+    _PROJECT_ROOT = _APP_DIR
+else:
+    _APP_DIR = Path(__file__).resolve().parent
+    _PROJECT_ROOT = _APP_DIR.parent
+
+_CONFIG_PATH = _APP_DIR / 'config.ini'
+_HISTORY_PATH = _APP_DIR / 'history.json'
+
+_STATUS_READY = "Ready"
+_STATUS_STARTING = "Starting video..."
+_STATUS_PLAYING = "▶ Playing video..."
+_STATUS_DONE = "✓ Playback completed"
+_STATUS_YTDLP_OK = "✓ yt-dlp is up to date"
+_STATUS_YTDLP_FAILED = "⚠ yt-dlp update failed"
+
+# Read-only so the shared defaults can't be mutated through a config dict
+_DEFAULT_CONFIG = MappingProxyType({
+    'mpv_path': str(_PROJECT_ROOT / 'tools' / 'mpv.exe'),
+    'ytdlp_path': str(_PROJECT_ROOT / 'tools' / 'yt-dlp.exe'),
+    'log_dir': str(_PROJECT_ROOT / 'logs'),
+    'max_history': '10'
+})
+
+
+def _new_config_parser():
+    """ConfigParser for config.ini; values are plain paths, so no % interpolation"""
+    return configparser.ConfigParser(interpolation=None)
+
+
+def _config_bytes(config):
+    """Serialize a ConfigParser to UTF-8 bytes for a single write"""
+    buffer = io.StringIO()
+    config.write(buffer)
+    return buffer.getvalue().encode('utf-8')
+
+
+def _write_atomic(path, data):
+    """Write to a temporary file and swap it in so a crash can't leave a truncated file"""
+    tmp_path = path.with_name(path.name + '.tmp')
+    if isinstance(data, bytes):
+        tmp_path.write_bytes(data)
+    else:
+        tmp_path.write_text(data)
+    os.replace(tmp_path, path)
+
+
+# Supported URL shapes: watch, youtu.be, shorts, playlist and live
+_URL_RE = re.compile(
+    r'^(?:https?://)?(?:www\.)?'
+    r'(?:youtube\.com/(?:watch\?v=|shorts/|playlist\?list=|live/)|youtu\.be/)[\w-]+'
+)
+
+
+_STYLESHEET = """
+QMainWindow {
+    background-color: #f5f5f5;
+}
+
+#header {
+    color: #1a1a1a;
+}
+
+QLineEdit {
+    border: 2px solid #e0e0e0;
+    border-radius: 6px;
+    padding: 8px 12px;
+    background-color: white;
+    font-family: 'Segoe UI';
+    font-size: 10pt;
+}
+
+QLineEdit:focus {
+    border: 2px solid #2196F3;
+    background-color: white;
+}
+
+QPushButton {
+    border: none;
+    border-radius: 6px;
+    font-family: 'Segoe UI';
+    font-size: 10pt;
+    font-weight: bold;
+    padding: 8px 16px;
+
+}
+
+#primaryButton {
+    background-color: #2196F3;
+    color: white;
+}
+
+#primaryButton:hover {
+    background-color: #1976D2;
+}
+
+#primaryButton:pressed {
+    background-color: #1565C0;
+}
+
+#primaryButton:disabled {
+    background-color: #ccc;
+    color: #999;
+}
+
+#dangerButton {
+    background-color: #f44336;
+    color: white;
+}
+
+#dangerButton:hover {
+    background-color: #da190b;
+}
+
+#dangerButton:pressed {
+    background-color: #c41c00;
+}
+
+#dangerButton:disabled {
+    background-color: #ccc;
+    color: #999;
+}
+
+#actionButton {
+    background-color: #757575;
+    color: white;
+}
+
+#actionButton:hover {
+    background-color: #616161;
+}
+
+#actionButton:pressed {
+    background-color: #424242;
+}
+
+QComboBox {
+    border: 2px solid #e0e0e0;
+    border-radius: 6px;
+    padding: 6px 12px;
+    background-color: white;
+    font-family: 'Segoe UI';
+    font-size: 10pt;
+}
+
+QComboBox:focus {
+    border: 2px solid #2196F3;
+}
+
+QCheckBox {
+    color: #333;
+    font-family: 'Segoe UI';
+    font-size: 10pt;
+    spacing: 6px;
+}
+
+QCheckBox::indicator {
+    width: 18px;
+    height: 18px;
+    border-radius: 3px;
+    border: 2px solid #999;
+}
+
+QCheckBox::indicator:checked {
+    background-color: #2196F3;
+    border: 2px solid #2196F3;
+}
+
+#optionsFrame {
+    background-color: white;
+    border-radius: 6px;
+    border: 1px solid #e0e0e0;
+}
+
+#logText {
+    background-color: white;
+    border: 1px solid #e0e0e0;
+    border-radius: 6px;
+    padding: 10px;
+    color: #333;
+}
+
+#statusBar {
+    color: #666;
+    padding: 8px;
+    background-color: #f0f0f0;
+    border-radius: 4px;
+}
+
+QLabel {
+    color: #333;
+}
+"""
 
 
 class WorkerThread(QThread):
@@ -39,19 +246,82 @@ class WorkerThread(QThread):
             self.error.emit(str(e))
 
 
+class CachedTimeFormatter(logging.Formatter):
+    """Formatter that renders each second's timestamp only once"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cached_time = (None, '')
+    
+    def formatTime(self, record, datefmt=None):
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        
+        second = int(record.created)
+        cached_second, text = self.cached_time
+        if second != cached_second:
+            text = time.strftime(self.default_time_format, self.converter(second))
+            self.cached_time = (second, text)
+        return self.default_msec_format % (text, record.msecs)
+
+
+class BufferedFileHandler(logging.FileHandler):
+    """File handler that writes through a large buffer and leaves flushing to the caller"""
+    
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=65536,
+                    encoding=self.encoding, errors=self.errors)
+    
+    def emit(self, record):
+        if self.stream is None:
+            self.stream = self._open()
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """Queue listener that flushes its handlers once the queue runs dry instead of per record"""
+    
+    def handle(self, record):
+        super().handle(record)
+        if self.queue.empty():
+            self.flush()
+    
+    def stop(self):
+        super().stop()
+        self.flush()
+    
+    def flush(self):
+        for handler in self.handlers:
+            handler.flush()
+
+
 class YouTubePlayerApp(QMainWindow):
+    # Shared fonts, created on first use by ensure_fonts
+    FONT_HEADER = None
+    FONT_LABEL = None
+    FONT_OPTION = None
+    FONT_STATUS = None
+    
     def __init__(self):
         super().__init__()
-        self.config = self.load_config()
-        self.mpv_path = self.config.get('mpv_path')
-        self.log_dir = self.config.get('log_dir')
-        self.max_history = int(self.config.get('max_history', '10'))
-        self.ytdlp_path = self.config.get('ytdlp_path')
+        self.ensure_fonts()
+        # Defaults until deferred_init loads the real config
+        self.apply_config(dict(_DEFAULT_CONFIG))
         self.is_playing = False
         
         self.process = None
-        self.history = self.load_history()
-        self.setup_logging()
+        self.ytdlp_process = None
+        
+        # Single background worker for history writes; one thread keeps writes in order
+        self.background = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ytp-bg')
+        self.pending_writes = {}
+        
+        self.history = OrderedDict()
+        self.logger = logging.getLogger(__name__)
+        self.log_listener = None
         
         self.setWindowTitle("YouTube Adfree Player v1.2.0")
         self.setGeometry(100, 100, 700, 380)
@@ -59,134 +329,174 @@ class YouTubePlayerApp(QMainWindow):
         
         self.setup_ui()
         self.setup_stylesheet()
-        self.setup_timers()
         self.setup_shortcuts()
         
+        # Let the window paint before touching the disk
+        QTimer.singleShot(0, self.deferred_init)
+    
+    def deferred_init(self):
+        """Load config, logging and history once the window is shown"""
+        self.apply_config(self.load_config())
+        self.setup_logging()
+        self.history = self.load_history()
+        self.refresh_history_combo()
+        
         self.logger.info("Application initialized successfully")
         
-        # Update yt-dlp in background
-        self.update_ytdlp_background()
+        # Update yt-dlp in background once startup has settled
+        QTimer.singleShot(5000, self.update_ytdlp_background)
+    
+    def apply_config(self, config):
+        """Take paths and limits from a config dict"""
+        self.config = config
+        self.mpv_path = config.get('mpv_path')
+        self.log_dir = config.get('log_dir')
+        self.max_history = int(config.get('max_history', '10'))
+        self.ytdlp_path = config.get('ytdlp_path')
+        
+        # Tool lookups, keyed 'mpv' / 'ytdlp', are cached until the paths change
+        self.tools_found = {}
+    
+    def tool_ok(self, name, path):
+        """Check whether a tool exists, caching a positive answer under the tool's name"""
+        # Misses are re-checked so a tool installed mid-session is picked up without a restart
+        if not self.tools_found.get(name):
+            self.tools_found[name] = (
+                os.path.isfile(path)
+                # CreateProcess (used by QProcess) appends .exe to an extensionless path
+                or (sys.platform == 'win32' and os.path.isfile(path + '.exe'))
+                or shutil.which(path) is not None
+            )
+        return self.tools_found[name]
+    
+    @classmethod
+    def ensure_fonts(cls):
+        """Create the shared fonts once; QFont needs a running QApplication"""
+        if cls.FONT_HEADER is None:
+            cls.FONT_HEADER = QFont("Segoe UI", 24, QFont.Weight.Bold)
+            cls.FONT_LABEL = QFont("Segoe UI", 10, QFont.Weight.Bold)
+            cls.FONT_OPTION = QFont("Segoe UI", 10)
+            cls.FONT_STATUS = QFont("Segoe UI", 9)
     
     def load_config(self):
         """Load configuration from file or create default"""
-        import configparser
-        config = configparser.ConfigParser()
-        
-        # Use appropriate directory based on whether running as script or packaged
-        if getattr(sys, 'frozen', False):
-            # Running as compiled executable
-            app_dir = os.path.dirname(sys.executable)
-            src_dir = app_dir
-            project_root = app_dir
-        else:
-            # Running as script
-            src_dir = os.path.dirname(os.path.abspath(__file__))
-            project_root = os.path.dirname(src_dir)
-        
-        config_path = os.path.join(src_dir, 'config.ini')
-        
-        default_config = {
-            'mpv_path': os.path.join(project_root, 'tools', 'mpv.exe'),
-            'ytdlp_path': os.path.join(project_root, 'tools', 'yt-dlp.exe'),
-            'log_dir': os.path.join(project_root, 'logs'),
-            'max_history': '10'
-        }
+        config = _new_config_parser()
         
-        if os.path.exists(config_path):
-            config.read(config_path)
-            if 'DEFAULT' not in config:
-                config['DEFAULT'] = default_config
-            else:
-                # Merge defaults for any missing keys
-                for key, value in default_config.items():
-                    if key not in config['DEFAULT']:
-                        config['DEFAULT'][key] = value
+        try:
+            data = _CONFIG_PATH.read_bytes()
+        except FileNotFoundError:
+            config['DEFAULT'] = _DEFAULT_CONFIG
+            _CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
+            _write_atomic(_CONFIG_PATH, _config_bytes(config))
         else:
-            config['DEFAULT'] = default_config
-            os.makedirs(os.path.dirname(config_path), exist_ok=True)
-            with open(config_path, 'w') as f:
-                config.write(f)
+            try:
+                text = data.decode('utf-8')
+            except UnicodeDecodeError:
+                # Older versions wrote the file in the locale encoding
+                text = data.decode(locale.getpreferredencoding(False))
+            config.read_string(text)
+            
+            # Merge defaults for any missing keys
+            for key, value in _DEFAULT_CONFIG.items():
+                if key not in config['DEFAULT']:
+                    config['DEFAULT'][key] = value
         
         return dict(config['DEFAULT'])
     
     def save_config(self):
         """Save configuration to file"""
-        import configparser
-        config = configparser.ConfigParser()
-        
-        if getattr(sys, 'frozen', False):
-            current_dir = os.path.dirname(sys.executable)
-        else:
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-        
-        config_path = os.path.join(current_dir, 'config.ini')
-        
-        if os.path.exists(config_path):
-            config.read(config_path)
-        
-        if 'DEFAULT' not in config:
-            config['DEFAULT'] = {}
+        values = {
+            'mpv_path': self.mpv_path,
+            'ytdlp_path': self.ytdlp_path,
+            'log_dir': self.log_dir,
+            'max_history': str(self.max_history)
+        }
         
-        config['DEFAULT']['mpv_path'] = self.mpv_path
-        config['DEFAULT']['ytdlp_path'] = self.ytdlp_path
-        config['DEFAULT']['log_dir'] = self.log_dir
-        config['DEFAULT']['max_history'] = str(self.max_history)
+        # self.config mirrors what was last loaded or written, so unchanged settings need no write
+        if values == self.config:
+            return
         
-        with open(config_path, 'w') as f:
-            config.write(f)
+        config = _new_config_parser()
+        config['DEFAULT'] = values
+        # Written synchronously so the settings dialog can report a failure
+        _write_atomic(_CONFIG_PATH, _config_bytes(config))
+        self.config = values
     
     def load_history(self):
         """Load URL history from file"""
-        if getattr(sys, 'frozen', False):
-            current_dir = os.path.dirname(sys.executable)
-        else:
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-        
-        history_path = os.path.join(current_dir, 'history.json')
-        if os.path.exists(history_path):
-            try:
-                with open(history_path, 'r') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
+        try:
+            # Read bytes in both cases; json.loads detects UTF-8 like orjson does
+            data = _HISTORY_PATH.read_bytes()
+            history = orjson.loads(data) if orjson else json.loads(data)
+            for entry in history.values():
+                # Older versions stored ISO-format strings
+                if isinstance(entry['timestamp'], str):
+                    entry['timestamp'] = datetime.fromisoformat(entry['timestamp']).timestamp()
+            # Oldest first, so trimming can pop from the front
+            return OrderedDict(sorted(history.items(), key=lambda item: item[1]['timestamp']))
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            # Missing or unreadable history starts empty
+            return OrderedDict()
     
     def save_history(self):
         """Save URL history to file"""
-        if getattr(sys, 'frozen', False):
-            current_dir = os.path.dirname(sys.executable)
+        if orjson:
+            data = orjson.dumps(self.history)
         else:
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-        
-        history_path = os.path.join(current_dir, 'history.json')
-        
-        if len(self.history) > self.max_history:
-            keys_to_remove = sorted(self.history.keys(), 
-                                    key=lambda x: self.history[x]['timestamp'])[:len(self.history) - self.max_history]
-            for key in keys_to_remove:
-                del self.history[key]
+            data = json.dumps(self.history, separators=(',', ':'))
+        self.write_in_background(_HISTORY_PATH, data)
+    
+    def write_in_background(self, path, data):
+        """Queue a file write on the background pool; the newest data for a path wins"""
+        self.pending_writes[path] = data
+        self.background.submit(self.flush_pending_write, path)
+    
+    def flush_pending_write(self, path):
+        """Write the latest queued data for a path (runs on the background pool)"""
+        data = self.pending_writes.pop(path, None)
+        if data is None:
+            # Already written by an earlier job
+            return
         
-        with open(history_path, 'w') as f:
-            json.dump(self.history, f, indent=2)
+        try:
+            _write_atomic(path, data)
+        except Exception as e:
+            self.logger.error(f"Error writing {path.name}: {e}")
     
     def setup_logging(self):
         """Setup logging configuration"""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
-        if not os.path.exists(self.log_dir):
-            os.makedirs(self.log_dir)
-        
+        Path(self.log_dir).mkdir(parents=True, exist_ok=True)
         log_file = os.path.join(self.log_dir, f'youtube_player_{timestamp}.log')
         
-        logging.basicConfig(
-            level=logging.INFO,
-            format='[%(asctime)s] %(levelname)s: %(message)s',
-            handlers=[
-                logging.FileHandler(log_file),
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
+        # The format only uses time, level and message; skip collecting thread/process info per record
+        logging.logThreads = False
+        logging.logProcesses = False
+        logging.logMultiprocessing = False
+        
+        formatter = CachedTimeFormatter('[%(asctime)s] %(levelname)s: %(message)s')
+        
+        file_handler = BufferedFileHandler(log_file, delay=True)
+        file_handler.setFormatter(formatter)
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(formatter)
+        
+        # Callers only enqueue records; the listener thread writes them out in batches
+        log_queue = queue.SimpleQueue()
+        self.log_listener = BatchingQueueListener(log_queue, file_handler, stream_handler)
+        self.log_listener.start()
+        
+        # Leave the message bare; the listener's handlers apply the real format
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.setFormatter(logging.Formatter('%(message)s'))
+        
+        # Configure our own logger rather than basicConfig, which silently does nothing
+        # if the root logger already has handlers
         self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.INFO)
+        self.logger.addHandler(queue_handler)
+        self.logger.propagate = False
     
     def setup_ui(self):
         """Setup the main UI"""
@@ -199,8 +509,7 @@ class YouTubePlayerApp(QMainWindow):
         
         # Header
         header = QLabel("YouTube Player")
-        header_font = QFont("Segoe UI", 24, QFont.Weight.Bold)
-        header.setFont(header_font)
+        header.setFont(self.FONT_HEADER)
         header.setObjectName("header")
         main_layout.addWidget(header)
         
@@ -209,8 +518,7 @@ class YouTubePlayerApp(QMainWindow):
         url_layout.setSpacing(8)
         
         url_label = QLabel("Video URL")
-        url_label_font = QFont("Segoe UI", 10, QFont.Weight.Bold)
-        url_label.setFont(url_label_font)
+        url_label.setFont(self.FONT_LABEL)
         url_layout.addWidget(url_label)
         
         input_layout = QHBoxLayout()
@@ -232,9 +540,11 @@ class YouTubePlayerApp(QMainWindow):
         # History Dropdown
         self.history_combo = QComboBox()
         self.history_combo.setMinimumHeight(35)
-        self.history_combo.addItems(list(self.history.keys()))
-        self.history_combo.currentIndexChanged.connect(self.select_history_url)
-        self.history_combo.insertItem(0, "Recently played videos...")
+        self.history_combo.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)
+        # Entries are filled in by refresh_history_combo once history is loaded
+        self.history_combo.addItem("Recently played videos...")
+        # activated only fires for user picks, not for programmatic changes to the list
+        self.history_combo.activated.connect(self.select_history_url)
         url_layout.addWidget(self.history_combo)
         
         main_layout.addLayout(url_layout)
@@ -248,13 +558,18 @@ class YouTubePlayerApp(QMainWindow):
         
         self.fullscreen_check = QCheckBox("🖥 Fullscreen")
         self.fullscreen_check.setChecked(True)
-        self.fullscreen_check.setFont(QFont("Segoe UI", 10))
+        self.fullscreen_check.setFont(self.FONT_OPTION)
         options_layout.addWidget(self.fullscreen_check)
         
         self.loop_check = QCheckBox("🔄 Loop Video")
-        self.loop_check.setFont(QFont("Segoe UI", 10))
+        self.loop_check.setFont(self.FONT_OPTION)
         options_layout.addWidget(self.loop_check)
         
+        # MPV's option arguments only change when a checkbox does
+        self.rebuild_mpv_args()
+        self.fullscreen_check.toggled.connect(self.rebuild_mpv_args)
+        self.loop_check.toggled.connect(self.rebuild_mpv_args)
+        
         options_layout.addStretch()
         main_layout.addWidget(options_frame)
         
@@ -291,182 +606,28 @@ class YouTubePlayerApp(QMainWindow):
         main_layout.addStretch()
         
         # Status Bar
-        self.status_label = QLabel("Ready")
-        self.status_label.setFont(QFont("Segoe UI", 9))
+        self.status_label = QLabel(_STATUS_READY)
+        self.status_label.setFont(self.FONT_STATUS)
         self.status_label.setObjectName("statusBar")
         main_layout.addWidget(self.status_label)
     
     def setup_stylesheet(self):
         """Setup modern stylesheet"""
-        stylesheet = """
-        QMainWindow {
-            background-color: #f5f5f5;
-        }
-        
-        #header {
-            color: #1a1a1a;
-        }
-        
-        QLineEdit {
-            border: 2px solid #e0e0e0;
-            border-radius: 6px;
-            padding: 8px 12px;
-            background-color: white;
-            font-family: 'Segoe UI';
-            font-size: 10pt;
-        }
-        
-        QLineEdit:focus {
-            border: 2px solid #2196F3;
-            background-color: white;
-        }
-        
-        QPushButton {
-            border: none;
-            border-radius: 6px;
-            font-family: 'Segoe UI';
-            font-size: 10pt;
-            font-weight: bold;
-            padding: 8px 16px;
-            
-        }
-        
-        #primaryButton {
-            background-color: #2196F3;
-            color: white;
-        }
-        
-        #primaryButton:hover {
-            background-color: #1976D2;
-        }
-        
-        #primaryButton:pressed {
-            background-color: #1565C0;
-        }
-        
-        #primaryButton:disabled {
-            background-color: #ccc;
-            color: #999;
-        }
-        
-        #dangerButton {
-            background-color: #f44336;
-            color: white;
-        }
-        
-        #dangerButton:hover {
-            background-color: #da190b;
-        }
-        
-        #dangerButton:pressed {
-            background-color: #c41c00;
-        }
-        
-        #dangerButton:disabled {
-            background-color: #ccc;
-            color: #999;
-        }
-        
-        #actionButton {
-            background-color: #757575;
-            color: white;
-        }
-        
-        #actionButton:hover {
-            background-color: #616161;
-        }
-        
-        #actionButton:pressed {
-            background-color: #424242;
-        }
-        
-        QComboBox {
-            border: 2px solid #e0e0e0;
-            border-radius: 6px;
-            padding: 6px 12px;
-            background-color: white;
-            font-family: 'Segoe UI';
-            font-size: 10pt;
-        }
-        
-        QComboBox:focus {
-            border: 2px solid #2196F3;
-        }
-        
-        QCheckBox {
-            color: #333;
-            font-family: 'Segoe UI';
-            font-size: 10pt;
-            spacing: 6px;
-        }
-        
-        QCheckBox::indicator {
-            width: 18px;
-            height: 18px;
-            border-radius: 3px;
-            border: 2px solid #999;
-        }
-        
-        QCheckBox::indicator:checked {
-            background-color: #2196F3;
-            border: 2px solid #2196F3;
-        }
-        
-        #optionsFrame {
-            background-color: white;
-            border-radius: 6px;
-            border: 1px solid #e0e0e0;
-        }
-        
-        #logText {
-            background-color: white;
-            border: 1px solid #e0e0e0;
-            border-radius: 6px;
-            padding: 10px;
-            color: #333;
-        }
-        
-        #statusBar {
-            color: #666;
-            padding: 8px;
-            background-color: #f0f0f0;
-            border-radius: 4px;
-        }
-        
-        QLabel {
-            color: #333;
-        }
-        """
-        self.setStyleSheet(stylesheet)
-    
-    def setup_timers(self):
-        """Setup application timers"""
-        self.check_timer = QTimer()
-        self.check_timer.timeout.connect(self.check_video_status)
-        self.check_timer.start(1000)
+        self.setStyleSheet(_STYLESHEET)
     
     def setup_shortcuts(self):
         """Setup keyboard shortcuts"""
-        from PyQt6.QtGui import QKeySequence
-        
         self.play_btn.setShortcut(QKeySequence(Qt.Modifier.CTRL | Qt.Key.Key_P))
         self.stop_btn.setShortcut(QKeySequence(Qt.Key.Key_Escape))
     
     def validate_url(self, url):
         """Validate YouTube URL format"""
-        patterns = [
-            r'^(https?://)?(www\.)?(youtube\.com/watch\?v=[\w-]+(&\S*)?)',
-            r'^(https?://)?(www\.)?(youtu\.be/[\w-]+(\?\S*)?)',
-            r'^(https?://)?(www\.)?(youtube\.com/shorts/[\w-]+(\?\S*)?)',
-            r'^(https?://)?(www\.)?(youtube\.com/playlist\?list=[\w-]+(&\S*)?)',
-            r'^(https?://)?(www\.)?(youtube\.com/live/[\w-]+(\?\S*)?)'
-        ]
-        return any(re.match(pattern, url) for pattern in patterns)
+        return _URL_RE.match(url) is not None
     
     def paste_url(self):
         """Paste URL from clipboard"""
         try:
-            clipboard_text = pyperclip.paste()
+            clipboard_text = QApplication.clipboard().text()
             self.url_input.setText(clipboard_text)
             self.logger.info("URL pasted from clipboard")
         except Exception as e:
@@ -482,19 +643,43 @@ class YouTubePlayerApp(QMainWindow):
     
     def add_to_history(self, url):
         """Add URL to history"""
-        if url not in self.history:
+        now = time.time()
+        is_new = url not in self.history
+        if is_new:
             self.history[url] = {
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': now,
                 'play_count': 1
             }
         else:
             self.history[url]['play_count'] += 1
-            self.history[url]['timestamp'] = datetime.now().isoformat()
+            self.history[url]['timestamp'] = now
+        self.history.move_to_end(url)
+        
+        # Oldest entries are at the front
+        while len(self.history) > self.max_history:
+            self.history.popitem(last=False)
         
         self.save_history()
+        
+        # Move the URL to the top of the dropdown (below the placeholder) instead of
+        # rebuilding it, and drop anything trimmed off the bottom
+        self.history_combo.blockSignals(True)
+        if not is_new:
+            self.history_combo.removeItem(self.history_combo.findText(url))
+        self.history_combo.insertItem(1, url)
+        while self.history_combo.count() - 1 > len(self.history):
+            self.history_combo.removeItem(self.history_combo.count() - 1)
+        self.history_combo.setCurrentIndex(0)
+        self.history_combo.blockSignals(False)
+    
+    def refresh_history_combo(self):
+        """Repopulate the history dropdown from self.history, newest first"""
+        self.history_combo.blockSignals(True)
         self.history_combo.clear()
         self.history_combo.addItem("Recently played videos...")
-        self.history_combo.addItems(list(self.history.keys()))
+        self.history_combo.addItems(reversed(self.history))
+        self.history_combo.setCurrentIndex(0)
+        self.history_combo.blockSignals(False)
     
     def play_video(self):
         """Play video using MPV"""
@@ -510,57 +695,112 @@ class YouTubePlayerApp(QMainWindow):
             QMessageBox.warning(self, "Error", "Invalid YouTube URL format")
             return
         
+        if not self.tool_ok('mpv', self.mpv_path):
+            self.logger.error(f"MPV not found at {self.mpv_path}")
+            QMessageBox.critical(self, "Playback Error",
+                                 f"MPV player not found at:\n{self.mpv_path}\n\nCheck the path in Settings.")
+            return
+        
         try:
             self.stop_video()
             self.logger.info(f"Starting video playback: {url}")
             
-            cmd = [self.mpv_path]
-            
-            if self.fullscreen_check.isChecked():
-                cmd.append('--fullscreen')
-            
-            if self.loop_check.isChecked():
-                cmd.append('--loop-file=inf')
-            
-            cmd.extend(['--really-quiet', url])
-            
-            self.process = subprocess.Popen(cmd)
-            self.add_to_history(url)
+            # QProcess reports start, failure and exit through signals
+            process = QProcess(self)
+            # MPV's output is never read; don't let QProcess pipe and buffer it
+            process.setStandardInputFile(QProcess.nullDevice())
+            process.setStandardOutputFile(QProcess.nullDevice())
+            process.setStandardErrorFile(QProcess.nullDevice())
+            process.started.connect(lambda: self.on_playback_started(process, url))
+            process.errorOccurred.connect(lambda error: self.on_playback_error(process, error))
+            process.finished.connect(lambda exit_code, exit_status: self.on_playback_finished(process))
+            self.process = process
+            # Set the starting state first: on Windows started()/errorOccurred() fire inside start()
             self.update_ui_state(is_playing=True)
-            self.status_label.setText("▶ Playing video...")
+            self.status_label.setText(_STATUS_STARTING)
+            process.start(self.mpv_path, self.mpv_args + [url])
             
         except Exception as e:
             self.logger.error(f"Playback error: {e}")
             QMessageBox.critical(self, "Playback Error", str(e))
     
+    def on_playback_started(self, process, url):
+        """Handle MPV having started"""
+        if process is not self.process:
+            return
+        
+        self.add_to_history(url)
+        self.status_label.setText(_STATUS_PLAYING)
+    
+    def on_playback_error(self, process, error):
+        """Handle MPV failing to start"""
+        # Crashes and terminations are followed by finished(); only a failed start needs handling here
+        if error != QProcess.ProcessError.FailedToStart:
+            return
+        
+        process.deleteLater()
+        if process is not self.process:
+            return
+        
+        self.process = None
+        self.logger.error(f"Playback error: {process.errorString()}")
+        self.update_ui_state(is_playing=False)
+        self.status_label.setText(_STATUS_READY)
+        QMessageBox.critical(self, "Playback Error", process.errorString())
+    
+    def rebuild_mpv_args(self):
+        """Rebuild MPV's option arguments from the checkboxes"""
+        args = []
+        
+        if self.fullscreen_check.isChecked():
+            args.append('--fullscreen')
+        
+        if self.loop_check.isChecked():
+            args.append('--loop-file=inf')
+        
+        args.append('--really-quiet')
+        self.mpv_args = args
+    
     def stop_video(self):
         """Stop video playback"""
         if self.process:
+            # Detach first so the finished() emitted while stopping is ignored
+            process, self.process = self.process, None
             try:
                 self.logger.info("Stopping video playback")
-                self.process.terminate()
-                try:
-                    self.process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    self.process.kill()
-                self.process = None
+                if sys.platform == 'win32':
+                    # terminate() only posts WM_CLOSE, which MPV can't receive before its
+                    # window exists; kill() is TerminateProcess, as Popen.terminate() was
+                    process.kill()
+                else:
+                    process.terminate()
+                if not process.waitForFinished(5000):
+                    process.kill()
             except Exception as e:
                 self.logger.error(f"Error stopping video: {e}")
         
         self.update_ui_state(is_playing=False)
-        self.status_label.setText("Ready")
+        self.status_label.setText(_STATUS_READY)
     
-    def check_video_status(self):
-        """Check if video is still playing"""
-        if self.process:
-            if self.process.poll() is not None:
-                self.logger.info("Video playback completed")
-                self.process = None
-                self.update_ui_state(is_playing=False)
-                self.status_label.setText("✓ Playback completed")
+    def on_playback_finished(self, process):
+        """Handle MPV exiting on its own"""
+        process.deleteLater()
+        
+        # Ignore processes that were already stopped or replaced from the UI
+        if process is not self.process:
+            return
+        
+        self.logger.info("Video playback completed")
+        self.process = None
+        self.update_ui_state(is_playing=False)
+        self.status_label.setText(_STATUS_DONE)
     
     def update_ui_state(self, is_playing):
         """Update UI state based on playback"""
+        if is_playing == self.is_playing:
+            return
+        self.is_playing = is_playing
+        
         self.play_btn.setEnabled(not is_playing)
         self.stop_btn.setEnabled(is_playing)
         self.url_input.setEnabled(not is_playing)
@@ -571,7 +811,7 @@ class YouTubePlayerApp(QMainWindow):
         dialog = QDialog(self)
         dialog.setWindowTitle("Settings")
         dialog.setGeometry(200, 200, 550, 450)
-        dialog.setStyleSheet(self.styleSheet())
+        dialog.setStyleSheet(_STYLESHEET)
         
         layout = QVBoxLayout(dialog)
         layout.setContentsMargins(20, 20, 20, 20)
@@ -579,7 +819,7 @@ class YouTubePlayerApp(QMainWindow):
         
         # MPV Path
         mpv_label = QLabel("MPV Player Path:")
-        mpv_label.setFont(QFont("Segoe UI", 10, QFont.Weight.Bold))
+        mpv_label.setFont(self.FONT_LABEL)
         layout.addWidget(mpv_label)
         
         mpv_layout = QHBoxLayout()
@@ -594,7 +834,7 @@ class YouTubePlayerApp(QMainWindow):
         
         # YT-DLP Path
         ytdlp_label = QLabel("YT-DLP Path:")
-        ytdlp_label.setFont(QFont("Segoe UI", 10, QFont.Weight.Bold))
+        ytdlp_label.setFont(self.FONT_LABEL)
         layout.addWidget(ytdlp_label)
         
         ytdlp_layout = QHBoxLayout()
@@ -609,7 +849,7 @@ class YouTubePlayerApp(QMainWindow):
         
         # Log Directory
         log_label = QLabel("Log Directory:")
-        log_label.setFont(QFont("Segoe UI", 10, QFont.Weight.Bold))
+        log_label.setFont(self.FONT_LABEL)
         layout.addWidget(log_label)
         
         log_layout = QHBoxLayout()
@@ -624,7 +864,7 @@ class YouTubePlayerApp(QMainWindow):
         
         # Max History
         history_label = QLabel("Max History Items:")
-        history_label.setFont(QFont("Segoe UI", 10, QFont.Weight.Bold))
+        history_label.setFont(self.FONT_LABEL)
         layout.addWidget(history_label)
         
         history_spin = QSpinBox()
@@ -673,6 +913,10 @@ class YouTubePlayerApp(QMainWindow):
     def save_settings_dialog(self, mpv_path, ytdlp_path, log_dir, max_history, dialog):
         """Save settings"""
         try:
+            if mpv_path != self.mpv_path:
+                self.tools_found.pop('mpv', None)
+            if ytdlp_path != self.ytdlp_path:
+                self.tools_found.pop('ytdlp', None)
             self.mpv_path = mpv_path
             self.ytdlp_path = ytdlp_path
             self.log_dir = log_dir
@@ -692,39 +936,83 @@ class YouTubePlayerApp(QMainWindow):
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         )
         if reply == QMessageBox.StandardButton.Yes:
-            self.history = {}
+            self.history = OrderedDict()
             self.save_history()
-            self.history_combo.clear()
-            self.history_combo.addItem("Recently played videos...")
+            self.refresh_history_combo()
             self.logger.info("History cleared")
     
     def update_ytdlp_background(self):
         """Update yt-dlp in background"""
-        def update():
-            try:
-                if not os.path.exists(self.ytdlp_path):
-                    self.logger.warning(f"yt-dlp not found at {self.ytdlp_path}")
-                    return
-                
-                self.logger.info("Updating yt-dlp...")
-                process = subprocess.Popen(
-                    [self.ytdlp_path, "-U"],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0
-                )
-                process.communicate(timeout=30)
-                self.logger.info("yt-dlp updated successfully")
-            except Exception as e:
-                self.logger.warning(f"Error updating yt-dlp: {e}")
+        if not self.tool_ok('ytdlp', self.ytdlp_path):
+            self.logger.warning(f"yt-dlp not found at {self.ytdlp_path}")
+            return
+        
+        self.logger.info("Updating yt-dlp...")
+        process = QProcess(self)
+        process.setStandardOutputFile(QProcess.nullDevice())
+        process.setStandardErrorFile(QProcess.nullDevice())
+        process.finished.connect(lambda exit_code, exit_status: self.on_ytdlp_finished(process, exit_code, exit_status))
+        process.errorOccurred.connect(lambda error: self.on_ytdlp_error(process, error))
+        
+        # Give up on an update that hangs; the timer goes away with the process
+        timeout = QTimer(process)
+        timeout.setSingleShot(True)
+        timeout.timeout.connect(process.kill)
+        timeout.start(30000)
+        
+        self.ytdlp_process = process
+        process.start(self.ytdlp_path, ['-U'])
+    
+    def on_ytdlp_finished(self, process, exit_code, exit_status):
+        """Handle the yt-dlp update process exiting"""
+        process.deleteLater()
+        # Ignore an update that was killed on shutdown
+        if process is not self.ytdlp_process:
+            return
+        self.ytdlp_process = None
+        
+        if exit_status != QProcess.ExitStatus.NormalExit:
+            self.on_ytdlp_updated(False, "yt-dlp update timed out or crashed")
+        elif exit_code != 0:
+            self.on_ytdlp_updated(False, f"yt-dlp update exited with code {exit_code}")
+        else:
+            self.on_ytdlp_updated(True, "yt-dlp updated successfully")
+    
+    def on_ytdlp_error(self, process, error):
+        """Handle the yt-dlp update process failing to start"""
+        # Other errors are followed by finished()
+        if error != QProcess.ProcessError.FailedToStart:
+            return
+        
+        process.deleteLater()
+        if process is not self.ytdlp_process:
+            return
+        self.ytdlp_process = None
+        self.on_ytdlp_updated(False, f"Error updating yt-dlp: {process.errorString()}")
+    
+    def on_ytdlp_updated(self, success, message):
+        """Report the result of the background yt-dlp update"""
+        if success:
+            self.logger.info(message)
+        else:
+            self.logger.warning(message)
         
-        thread = threading.Thread(target=update, daemon=True)
-        thread.start()
+        # Don't overwrite the playback status
+        if not self.is_playing:
+            self.status_label.setText(_STATUS_YTDLP_OK if success else _STATUS_YTDLP_FAILED)
     
     def closeEvent(self, event):
         """Handle window close"""
         self.logger.info("Application shutting down")
         self.stop_video()
+        if self.ytdlp_process:
+            # Detach first so the finished() emitted by the kill is ignored
+            process, self.ytdlp_process = self.ytdlp_process, None
+            process.kill()
+            process.waitForFinished()
+        self.background.shutdown(wait=True)
+        if self.log_listener:
+            self.log_listener.stop()
         super().closeEvent(event)
 
 